@@ -2,9 +2,11 @@ import json
 import boto3
 import logging
 import os
-import time
+from functools import lru_cache
 from urllib.parse import urlparse
 from botocore.config import Config
+from botocore.exceptions import WaiterError
+from botocore.waiter import WaiterModel, create_waiter_with_client
 import re
 
 # Set up logging
@@ -18,7 +20,12 @@ bedrock_runtime = boto3.client(
     "bedrock-runtime",
     region_name=os.environ.get("AWS_REGION"),
     # High timeout to handle increased response times for large payloads
-    config=Config(connect_timeout=30, read_timeout=300, retries={"max_attempts": 3}),
+    config=Config(
+        connect_timeout=30,
+        read_timeout=300,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        tcp_keepalive=True,
+    ),
 )
 
 
@@ -27,7 +34,56 @@ MODEL_ID = os.environ.get(
     "AGENDA_MODEL_ID", "us.anthropic.claude-sonnet-4-20250514-v1:0"
 )
 MAX_TEXTRACT_WAIT_TIME = 15 * 60  # 15 minutes
-TEXTRACT_POLL_INTERVAL = 30  # Poll every 30 seconds
+TEXTRACT_POLL_INTERVAL = 10  # Poll every 10 seconds
+
+# Textract has no built-in waiter for async text detection, so define one; the
+# SDK then owns the polling cadence and the deadline. A waiter stops on any
+# error no acceptor matches, so throttling is listed explicitly as a retry
+TEXTRACT_WAITER_MODEL = WaiterModel(
+    {
+        "version": 2,
+        "waiters": {
+            "TextDetectionJobComplete": {
+                "operation": "GetDocumentTextDetection",
+                "delay": TEXTRACT_POLL_INTERVAL,
+                "maxAttempts": MAX_TEXTRACT_WAIT_TIME // TEXTRACT_POLL_INTERVAL,
+                "acceptors": [
+                    {
+                        "state": "success",
+                        "matcher": "path",
+                        "argument": "JobStatus",
+                        "expected": "SUCCEEDED",
+                    },
+                    {
+                        "state": "failure",
+                        "matcher": "path",
+                        "argument": "JobStatus",
+                        "expected": "FAILED",
+                    },
+                    {
+                        "state": "failure",
+                        "matcher": "path",
+                        "argument": "JobStatus",
+                        "expected": "PARTIAL_SUCCESS",
+                    },
+                    {
+                        "state": "retry",
+                        "matcher": "error",
+                        "expected": "ThrottlingException",
+                    },
+                    {
+                        "state": "retry",
+                        "matcher": "error",
+                        "expected": "ProvisionedThroughputExceededException",
+                    },
+                ],
+            }
+        },
+    }
+)
+textract_job_waiter = create_waiter_with_client(
+    "TextDetectionJobComplete", TEXTRACT_WAITER_MODEL, textract_client
+)
 
 
 def extract_correlation_key(s3_key):
@@ -95,62 +151,45 @@ def start_textract_job(bucket, pdf_key):
 
 
 def poll_textract_job(job_id):
-    """Poll Textract job until completion"""
+    """Wait for a Textract job to finish, then extract its text"""
     logger.info(f"Polling Textract job {job_id}")
 
-    start_time = time.time()
-
-    while True:
-        try:
-            response = textract_client.get_document_text_detection(JobId=job_id)
-            job_status = response["JobStatus"]
-
-            logger.info(f"Textract job {job_id} status: {job_status}")
-
-            if job_status == "SUCCEEDED":
-                return extract_text_from_textract_response(response, job_id)
-            elif job_status == "FAILED":
-                raise Exception(f"Textract job {job_id} failed")
-            elif job_status in ["IN_PROGRESS"]:
-                # Check if we've exceeded max wait time
-                if time.time() - start_time > MAX_TEXTRACT_WAIT_TIME:
-                    raise Exception(f"Textract job {job_id} exceeded maximum wait time")
-
-                # Wait before polling again
-                time.sleep(TEXTRACT_POLL_INTERVAL)
-            else:
-                raise Exception(f"Unexpected Textract job status: {job_status}")
-
-        except Exception as e:
-            logger.error(f"Error polling Textract job {job_id}: {e}")
-            raise
+    try:
+        textract_job_waiter.wait(JobId=job_id)
+    except WaiterError as e:
+        logger.error(f"Error polling Textract job {job_id}: {e}")
+        job_status = e.last_response.get("JobStatus")
+        if job_status == "IN_PROGRESS":
+            raise Exception(f"Textract job {job_id} exceeded maximum wait time")
+        if job_status:
+            raise Exception(f"Textract job {job_id} failed with status: {job_status}")
+        error_code = e.last_response.get("Error", {}).get("Code")
+        raise Exception(f"Textract job {job_id} polling failed with error: {error_code}")
+
+    logger.info(f"Textract job {job_id} status: SUCCEEDED")
+    response = textract_client.get_document_text_detection(JobId=job_id)
+    return extract_text_from_textract_response(response, job_id)
 
 
 def extract_text_from_textract_response(response, job_id):
     """Extract all text from Textract response, handling pagination"""
     extracted_text = []
 
-    # Process first page of results
-    if "Blocks" in response:
-        for block in response["Blocks"]:
-            if block["BlockType"] == "LINE":
-                extracted_text.append(block["Text"])
+    while True:
+        extracted_text.extend(
+            block["Text"]
+            for block in response.get("Blocks", ())
+            if block["BlockType"] == "LINE"
+        )
 
-    # Handle pagination
-    next_token = response.get("NextToken")
-    while next_token:
+        # Handle pagination
+        next_token = response.get("NextToken")
+        if not next_token:
+            break
         try:
             response = textract_client.get_document_text_detection(
                 JobId=job_id, NextToken=next_token
             )
-
-            if "Blocks" in response:
-                for block in response["Blocks"]:
-                    if block["BlockType"] == "LINE":
-                        extracted_text.append(block["Text"])
-
-            next_token = response.get("NextToken")
-
         except Exception as e:
             logger.error(f"Error getting paginated Textract results: {e}")
             break
@@ -160,8 +199,9 @@ def extract_text_from_textract_response(response, job_id):
     return full_text
 
 
+@lru_cache(maxsize=1)
 def load_prompt_template():
-    """Load the agenda analysis prompt from file"""
+    """Load the agenda analysis prompt from file, once per container"""
     try:
         # Get the directory where this script is located
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -169,7 +209,7 @@ def load_prompt_template():
         logger.info(f"Loading prompt template from {prompt_file_path}")
         with open(prompt_file_path, "r", encoding="utf-8") as f:
             prompt_template = f.read()
-            logger.info(f"Prompt template: {prompt_template}")
+            logger.info(f"Loaded prompt template ({len(prompt_template)} characters)")
             return prompt_template
     except Exception as e:
         logger.error(f"Error loading prompt template: {e}")
@@ -249,7 +289,48 @@ def analyze_agenda(agenda_text):
         raise
 
 
-def save_results_to_s3(bucket, correlation_key, raw_text, analysis_json):
+def load_cached_analysis(bucket, correlation_key, source_etag):
+    """
+    Return the saved analysis if it was produced from this exact upload.
+
+    EventBridge delivers S3 events at least once; matching the agenda's ETag
+    against the one recorded on the analysis lets a redelivered event skip
+    Textract and Bedrock. A re-upload under the same name has a new ETag and
+    is processed again.
+    """
+    if not source_etag:
+        return None
+
+    analysis_key = f"processed/agenda/analysis/{correlation_key}.json"
+    raw_text_key = f"processed/agenda/raw_text/{correlation_key}.txt"
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=analysis_key)
+    except s3_client.exceptions.NoSuchKey:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not check for existing analysis {analysis_key}: {e}")
+        return None
+
+    metadata = response.get("Metadata", {})
+    if metadata.get("source-etag") != source_etag:
+        return None
+
+    analysis_json = json.loads(response["Body"].read())
+    if "error" in analysis_json:
+        # Earlier run could not parse the model output; try again
+        return None
+
+    return {
+        "analysis": analysis_json,
+        "characters_extracted": int(metadata.get("characters-extracted", 0)),
+        "s3_uris": {
+            "raw_text_s3_uri": f"s3://{bucket}/{raw_text_key}",
+            "analysis_s3_uri": f"s3://{bucket}/{analysis_key}",
+        },
+    }
+
+
+def save_results_to_s3(bucket, correlation_key, raw_text, analysis_json, source_etag=None):
     """Save processing results to S3"""
     try:
         # Save raw text
@@ -269,6 +350,11 @@ def save_results_to_s3(bucket, correlation_key, raw_text, analysis_json):
             Key=analysis_key,
             Body=json.dumps(analysis_json, indent=2).encode("utf-8"),
             ContentType="application/json",
+            # Lets a redelivered event for the same upload reuse this result
+            Metadata={
+                "source-etag": source_etag or "",
+                "characters-extracted": str(len(raw_text)),
+            },
         )
         logger.info(f"Saved analysis to s3://{bucket}/{analysis_key}")
 
@@ -286,6 +372,19 @@ def save_results_to_s3(bucket, correlation_key, raw_text, analysis_json):
 # Helper: robust JSON extraction from LLM responses
 # ------------------------------------------------------------
 
+JSON_CODE_FENCE_PATTERN = re.compile(r"```json\s*", re.IGNORECASE)
+LEADING_PHRASE_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE | re.DOTALL)
+    for pattern in (
+        r"^.*?here\s+is\s+the\s+json:?\s*",
+        r"^.*?json\s+response:?\s*",
+        r"^.*?result:?\s*",
+    )
+)
+JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+TRAILING_COMMA_PATTERN = re.compile(r",(\s*[}\]])")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 
 def extract_json_from_llm_response(response_text: str):
     """Extract JSON content from an LLM string that might be wrapped in
@@ -299,30 +398,25 @@ def extract_json_from_llm_response(response_text: str):
         raise ValueError("Empty response text from model")
 
     # 1. Strip triple-backtick code fences (``` or ```json)
-    text = re.sub(r"```json\s*", "", response_text, flags=re.IGNORECASE)
-    text = re.sub(r"```", "", text)
+    text = JSON_CODE_FENCE_PATTERN.sub("", response_text)
+    text = text.replace("```", "")
 
     # 2. Remove common leading phrases before the JSON starts
-    prefixes = [
-        r"^.*?here\s+is\s+the\s+json:?\s*",
-        r"^.*?json\s+response:?\s*",
-        r"^.*?result:?\s*",
-    ]
-    for pattern in prefixes:
-        text = re.sub(pattern, "", text, flags=re.IGNORECASE | re.DOTALL)
+    for pattern in LEADING_PHRASE_PATTERNS:
+        text = pattern.sub("", text)
 
     # 3. Grab the first JSON object in the string
-    json_match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+    json_match = JSON_OBJECT_PATTERN.search(text)
     if json_match:
         json_str = json_match.group(0)
     else:
         json_str = text.strip()
 
     # 4. Remove trailing commas before an object/array close
-    json_str = re.sub(r",(\s*[}\]])", r"\1", json_str)
+    json_str = TRAILING_COMMA_PATTERN.sub(r"\1", json_str)
 
     # 5. Attempt to parse – try progressively simpler clean-ups
-    attempts = [json_str, json_str.replace("\n", " "), re.sub(r"\s+", " ", json_str)]
+    attempts = [json_str, json_str.replace("\n", " "), WHITESPACE_PATTERN.sub(" ", json_str)]
     last_err = None
     for attempt in attempts:
         try:
@@ -342,7 +436,7 @@ def lambda_handler(event, context):
     {
         "detail": {
             "bucket": {"name": "bucket-name"},
-            "object": {"key": "uploads/agenda_documents/filename.pdf"}
+            "object": {"key": "uploads/agenda_documents/filename.pdf", "etag": "..."}
         }
     }
     """
@@ -364,19 +458,31 @@ def lambda_handler(event, context):
         video_info = check_for_corresponding_video(bucket_name, correlation_key)
         logger.info(f"Video check result: {video_info}")
 
-        # Start Textract job
-        textract_job_id = start_textract_job(bucket_name, pdf_key)
+        # Reuse the saved analysis if this exact upload was already processed
+        source_etag = event["detail"]["object"].get("etag")
+        cached_analysis = load_cached_analysis(bucket_name, correlation_key, source_etag)
+
+        if cached_analysis:
+            logger.info(f"Agenda {pdf_key} already analyzed (ETag {source_etag}), reusing results")
+            textract_job_id = None
+            agenda_analysis = cached_analysis["analysis"]
+            characters_extracted = cached_analysis["characters_extracted"]
+            s3_uris = cached_analysis["s3_uris"]
+        else:
+            # Start Textract job
+            textract_job_id = start_textract_job(bucket_name, pdf_key)
 
-        # Poll for completion and extract text
-        extracted_text = poll_textract_job(textract_job_id)
+            # Poll for completion and extract text
+            extracted_text = poll_textract_job(textract_job_id)
+            characters_extracted = len(extracted_text)
 
-        # Analyze extracted text
-        agenda_analysis = analyze_agenda(extracted_text)
+            # Analyze extracted text
+            agenda_analysis = analyze_agenda(extracted_text)
 
-        # Save results to S3
-        s3_uris = save_results_to_s3(
-            bucket_name, correlation_key, extracted_text, agenda_analysis
-        )
+            # Save results to S3
+            s3_uris = save_results_to_s3(
+                bucket_name, correlation_key, extracted_text, agenda_analysis, source_etag
+            )
 
         # The agenda data is now saved to S3 and will be automatically discovered
         # by any running Step Functions workflows during their agenda check phases
@@ -399,14 +505,14 @@ def lambda_handler(event, context):
             "s3_uris": s3_uris,
             "corresponding_video": video_info,
             "textract_job_id": textract_job_id,
-            "characters_extracted": len(extracted_text),
+            "characters_extracted": characters_extracted,
             "combined_processing_triggered": combined_processing_triggered,
             "execution_arn": execution_arn,
         }
 
         logger.info("=== AgendaProcessor Lambda Completed Successfully ===")
         logger.info(
-            f"Processed {len(extracted_text)} characters, found {len(agenda_analysis.get('agenda_items', []))} agenda items"
+            f"Processed {characters_extracted} characters, found {len(agenda_analysis.get('agenda_items', []))} agenda items"
         )
         if combined_processing_triggered:
             logger.info("Combined processing with video has been triggered")
@@ -3,53 +3,83 @@ import logging
 import boto3
 import tempfile
 from urllib.parse import urlparse
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 
 # Provided by lambda layer
 from weasyprint import HTML  # type: ignore
+from weasyprint.text.fonts import FontConfiguration  # type: ignore
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-s3_client = boto3.client("s3")
+s3_client = boto3.client(
+    "s3",
+    config=Config(
+        max_pool_connections=20,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        tcp_keepalive=True,
+    ),
+)
 
+# Fontconfig scans every installed font when a configuration is created; build
+# it once per container instead of once per render
+FONT_CONFIG = FontConfiguration()
 
-def fetch_html_from_s3(s3_uri: str) -> str:
-    """Download HTML file content from S3 and return as string."""
+# Write buffer for the rendered PDF on /tmp
+PDF_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Multipart settings for large PDF uploads
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+)
+
+
+def parse_s3_uri(s3_uri: str) -> tuple[str, str]:
+    """Split an s3://bucket/key URI into (bucket, key)."""
     parsed = urlparse(s3_uri)
     if parsed.scheme != "s3":
         raise ValueError(f"Expected S3 URI, got: {s3_uri}")
 
-    bucket = parsed.netloc
-    key = parsed.path.lstrip("/")
+    return parsed.netloc, parsed.path.lstrip("/")
 
+
+def fetch_html_from_s3(bucket: str, key: str) -> bytes:
+    """Download HTML file content from S3 and return the raw UTF-8 bytes."""
     logger.info(f"Downloading HTML from s3://{bucket}/{key}")
     response = s3_client.get_object(Bucket=bucket, Key=key)
-    content = response["Body"].read().decode("utf-8")
-    logger.info(f"Downloaded {len(content)} characters of HTML")
+    content = response["Body"].read()
+    logger.info(f"Downloaded {len(content)} bytes of HTML")
     return content
 
 
-def upload_pdf_to_s3(pdf_bytes: bytes, bucket: str, key: str) -> str:
-    logger.info(f"Uploading PDF to s3://{bucket}/{key} ({len(pdf_bytes)} bytes)")
-    s3_client.put_object(
-        Bucket=bucket,
-        Key=key,
-        Body=pdf_bytes,
-        ContentType="application/pdf",
+def upload_pdf_to_s3(pdf_path: str, bucket: str, key: str) -> str:
+    """Stream a local PDF file to S3, using multipart upload for large files."""
+    logger.info(f"Uploading PDF to s3://{bucket}/{key}")
+    s3_client.upload_file(
+        pdf_path,
+        bucket,
+        key,
+        ExtraArgs={"ContentType": "application/pdf"},
+        Config=S3_TRANSFER_CONFIG,
     )
     return f"s3://{bucket}/{key}"
 
 
-def convert_html_to_pdf(html_content: str) -> bytes:
-    """Convert HTML string to PDF bytes"""
-    with tempfile.NamedTemporaryFile(suffix=".html", delete=False) as tmp_html:
-        tmp_html.write(html_content.encode("utf-8"))
-        tmp_html.flush()
-        logger.info(f"Temporary HTML file created at {tmp_html.name}")
-
-        pdf_bytes = HTML(filename=tmp_html.name).write_pdf()
-    logger.info(f"Generated PDF with {len(pdf_bytes)} bytes")
-    return pdf_bytes
+def convert_html_to_pdf(html_content: bytes, pdf_path: str) -> int:
+    """Render an HTML document to a PDF file on local disk and return its size in bytes"""
+    # Render straight from the downloaded bytes; the parser decodes them itself,
+    # so there is no intermediate str copy or HTML file. WeasyPrint emits the PDF
+    # as many small writes; a large buffer batches them into a few syscalls
+    with open(pdf_path, "wb", buffering=PDF_WRITE_BUFFER_SIZE) as pdf_file:
+        HTML(string=html_content, encoding="utf-8").write_pdf(
+            pdf_file, font_config=FONT_CONFIG
+        )
+    pdf_size = os.path.getsize(pdf_path)
+    logger.info(f"Generated PDF with {pdf_size} bytes")
+    return pdf_size
 
 
 def lambda_handler(event, context):
@@ -69,21 +99,23 @@ def lambda_handler(event, context):
         raise ValueError("htmlS3Uri is required")
 
     # Use same bucket/prefix as HTML, change extension to .pdf
-    parsed = urlparse(html_s3_uri)
-    bucket = parsed.netloc
-    html_key = parsed.path.lstrip("/")
+    bucket, html_key = parse_s3_uri(html_s3_uri)
 
     job_root = os.path.splitext(os.path.basename(html_key))[0].replace("_analysis", "")
     output_pdf_key = f"analysis/{job_root}_analysis.pdf"
 
     # 1. Download HTML
-    html_content = fetch_html_from_s3(html_s3_uri)
+    html_content = fetch_html_from_s3(bucket, html_key)
+
+    # Render to /tmp and stream the file to S3 rather than holding the PDF in memory
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, f"{job_root}_analysis.pdf")
 
-    # 2. Convert to PDF
-    pdf_bytes = convert_html_to_pdf(html_content)
+        # 2. Convert to PDF
+        pdf_size = convert_html_to_pdf(html_content, pdf_path)
 
-    # 3. Upload PDF
-    pdf_s3_uri = upload_pdf_to_s3(pdf_bytes, bucket, output_pdf_key)
+        # 3. Upload PDF
+        pdf_s3_uri = upload_pdf_to_s3(pdf_path, bucket, output_pdf_key)
 
     logger.info("=== HtmlToPdfConverter Lambda Completed Successfully ===")
 
@@ -91,5 +123,5 @@ def lambda_handler(event, context):
         "statusCode": 200,
         "success": True,
         "pdfS3Uri": pdf_s3_uri,
-        "bytes": len(pdf_bytes),
+        "bytes": pdf_size,
     }
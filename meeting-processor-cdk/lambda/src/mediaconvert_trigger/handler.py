@@ -42,7 +42,9 @@ def generate_signed_url(bucket, key, expiration=SIGNED_URL_EXPIRATION):
 def get_video_duration_seconds(bucket, key):
     """Extract video duration using pymediainfo + presigned URL."""
     signed_url = generate_signed_url(bucket, key)
-    media_info = MediaInfo.parse(signed_url)
+    # Duration comes from the container header, so skip MediaInfo's default
+    # stream scan (ParseSpeed 0.5) and only fetch the byte ranges it needs
+    media_info = MediaInfo.parse(signed_url, parse_speed=0)
     for track in media_info.tracks:
         if track.track_type == "General" and getattr(track, "duration", None):
             return float(track.duration) / 1000.0
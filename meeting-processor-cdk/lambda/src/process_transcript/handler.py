@@ -1,17 +1,189 @@
 import os
 import boto3
-import json
 import logging
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from operator import itemgetter
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from urllib.parse import urlparse
-import datetime
+import time
 import re
-import markdown
+import ijson
+import orjson
+from markdown_it import MarkdownIt
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-s3_client = boto3.client("s3")
-bedrock_runtime = boto3.client("bedrock-runtime", region_name="us-west-2")
+# Larger connection pool so the upload pool and multipart transfers don't queue
+s3_client = boto3.client(
+    "s3",
+    config=Config(
+        max_pool_connections=50,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        tcp_keepalive=True,
+    ),
+)
+bedrock_runtime = boto3.client(
+    "bedrock-runtime",
+    region_name="us-west-2",
+    # Long read timeout for streamed analyses of multi-hour meetings
+    config=Config(
+        read_timeout=900,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        tcp_keepalive=True,
+    ),
+)
+
+# Multipart settings for large transcript/report uploads
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+)
+
+# Configuration - read once per container so warm invocations reuse it
+TRANSCRIPT_MODEL_ID = os.environ.get(
+    "TRANSCRIPT_MODEL_ID", "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+)
+TRANSCRIPT_MAX_TOKENS = int(os.environ.get("TRANSCRIPT_MAX_TOKENS", "8000"))
+TRANSCRIPT_TEMPERATURE = float(os.environ.get("TRANSCRIPT_TEMPERATURE", "0.2"))
+TRANSCRIPT_PROMPT_TEMPLATE = os.environ.get(
+    "TRANSCRIPT_PROMPT_TEMPLATE", "Default prompt template not configured"
+)
+FALLBACK_AGENDA_TEXT = os.environ.get(
+    "FALLBACK_AGENDA_TEXT", "General meeting agenda not configured"
+)
+# Full prompts embed the entire transcript; only log them when debugging
+LOG_FULL_PROMPT = os.environ.get("LOG_FULL_PROMPT", "false").lower() == "true"
+
+
+# Human-readable transcript line: [seg_X][speaker_label][HH:MM:SS] spoken text
+format_transcript_line = "[seg_{}][{}][{}] {}".format
+
+# Fields read from each Transcribe speaker_labels segment
+SPEAKER_SEGMENT_FIELDS = itemgetter("speaker_label", "start_time", "end_time")
+
+# Segment citations in the analysis text: [seg_X], [seg_X-Y] and [seg_X-seg_Y]
+SEGMENT_CITATION_PATTERN = re.compile(r"\[seg_(\d+)(?:-(?:seg_)?(\d+))?\]")
+
+# Video link marker: [seg_X]VIDEOLINK[url]ENDLINK
+VIDEO_LINK_PATTERN = re.compile(r"([^\s]+)VIDEOLINK\[([^\]]+)\]ENDLINK")
+
+# Markdown renderer for the report, built once per container. Raw HTML must stay
+# enabled: video links are inserted as <a> tags before rendering.
+MARKDOWN_RENDERER = MarkdownIt("commonmark", {"html": True}).enable("table")
+
+
+def format_timestamp(seconds):
+    """Format an offset in seconds as an HH:MM:SS timestamp."""
+    h = int(seconds // 3600)
+    m = int((seconds % 3600) // 60)
+    s = int(seconds % 60)
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def is_chronological(start_times):
+    """Return True if the start times are already in non-decreasing order."""
+    return all(a <= b for a, b in zip(start_times, start_times[1:]))
+
+
+def extract_transcript_segments(transcript_data):
+    """
+    Extracts chronological speaker segments from a raw Transcribe JSON.
+
+    Returns a list of (segment_number, speaker_label, start_time, text) tuples,
+    with start_time in seconds. Segments without any spoken content are skipped,
+    so segment numbers are not necessarily contiguous.
+
+    Raises ValueError if the transcript is not in the expected format.
+    """
+    # Check if the results contain the expected format
+    results = transcript_data.get("results")
+    if results is None or not {"speaker_labels", "items"} <= results.keys():
+        raise ValueError("Unexpected format in the transcript file.")
+
+    # Use audio_segments if available (preferred method)
+    if "audio_segments" in results:
+        logger.info("Using audio_segments for transcript processing")
+        segments = results["audio_segments"]
+        start_times = [float(segment["start_time"]) for segment in segments]
+
+        # Transcribe emits segments in chronological order; only sort if they are not
+        order = range(len(segments))
+        if not is_chronological(start_times):
+            order = sorted(order, key=start_times.__getitem__)
+
+        # Create a list of sequential utterances with speaker labels and IDs
+        return [
+            (
+                idx,
+                segments[i]["speaker_label"],
+                start_times[i],
+                segments[i]["transcript"],
+            )
+            for idx, i in enumerate(order)
+        ]
+
+    # If audio_segments doesn't exist, build segments from speaker_labels and items
+    logger.info("Using speaker_labels and items for transcript processing")
+    # Get speaker segments with timing information, pulling all three fields
+    # from each segment dict in one C-level itemgetter call
+    speaker_segments = [
+        (speaker, float(start), float(end))
+        for speaker, start, end in map(
+            SPEAKER_SEGMENT_FIELDS, results["speaker_labels"]["segments"]
+        )
+    ]
+
+    # Transcribe emits segments in chronological order; only sort if they are not
+    if not is_chronological([start for _, start, _ in speaker_segments]):
+        speaker_segments.sort(key=itemgetter(1))
+
+    # Get all pronunciation items as parallel start-time and text arrays,
+    # attaching any punctuation item that directly follows a word to that
+    # word's text
+    word_starts = array("d")
+    word_texts = []
+    previous_was_word = False
+    for item in results["items"]:
+        if not item.get("alternatives"):
+            previous_was_word = False
+            continue
+
+        content = item["alternatives"][0]["content"]
+        if item["type"] == "pronunciation":
+            word_starts.append(float(item.get("start_time", "0")))
+            word_texts.append(content)
+            previous_was_word = True
+        else:
+            if previous_was_word:
+                word_texts[-1] += content
+            previous_was_word = False
+
+    # Order words by start_time once so each segment's words form a contiguous
+    # run that can be located by bisection instead of scanning every word
+    if not is_chronological(word_starts):
+        order = sorted(range(len(word_starts)), key=word_starts.__getitem__)
+        word_starts = array("d", (word_starts[i] for i in order))
+        word_texts = [word_texts[i] for i in order]
+
+    # Build the sequential transcript segment by segment
+    transcript_segments = []
+
+    for idx, (speaker, segment_start, segment_end) in enumerate(speaker_segments):
+        lo = bisect_left(word_starts, segment_start)
+        hi = bisect_left(word_starts, segment_end, lo)
+
+        # Add the segment to the transcript if it has content
+        if hi > lo:
+            segment_text = " ".join(word_texts[lo:hi])
+            transcript_segments.append((idx, speaker, segment_start, segment_text))
+
+    return transcript_segments
 
 
 def convert_to_human_readable(transcript_data):
@@ -23,157 +195,79 @@ def convert_to_human_readable(transcript_data):
 
     This format allows easy parsing with regex: \\[([^\\]]+)\\]\\[([^\\]]+)\\]\\[([^\\]]+)\\] (.+)
     Groups: (1) segment_id, (2) speaker, (3) timestamp, (4) text
+
+    Returns a (transcript_text, segment_mapping) tuple, where segment_mapping maps
+    segment IDs to their timestamps, e.g. {"seg_0": "00:00:15", ...}
     """
     try:
-        # Check if the results contain the expected format
-        if (
-            "results" not in transcript_data
-            or "speaker_labels" not in transcript_data["results"]
-            or "items" not in transcript_data["results"]
-        ):
-            logger.error("Error: Unexpected format in the transcript file.")
-            return "Could not process transcript: unexpected format."
-
-        # Use audio_segments if available (preferred method)
-        if "audio_segments" in transcript_data["results"]:
-            logger.info("Using audio_segments for transcript processing")
-            # Sort segments by start_time to maintain chronological order
-            segments = sorted(
-                transcript_data["results"]["audio_segments"],
-                key=lambda x: float(x["start_time"]),
-            )
+        segments = extract_transcript_segments(transcript_data)
+
+        # Build the transcript lines and the segment mapping in one pass so each
+        # timestamp is formatted once
+        output_lines = []
+        segment_mapping = {}
+        append_line = output_lines.append
+        for idx, speaker, start_time, text in segments:
+            timestamp = format_timestamp(start_time)
+            append_line(format_transcript_line(idx, speaker, timestamp, text))
+            segment_mapping[f"seg_{idx}"] = timestamp
 
-            # Create a list of sequential utterances with speaker labels and IDs
-            output_lines = []
-            for idx, segment in enumerate(segments):
-                speaker = segment["speaker_label"]
-                text = segment["transcript"]
-                segment_id = f"seg_{idx}"
-                start_time = float(segment["start_time"])
+        logger.info(
+            f"Successfully converted transcript with {len(output_lines)} segments (with timestamps)"
+        )
+        return "\n".join(output_lines), segment_mapping
 
-                # Format timestamp
-                h = int(start_time // 3600)
-                m = int((start_time % 3600) // 60)
-                s = int(start_time % 60)
-                timestamp = f"{h:02d}:{m:02d}:{s:02d}"
+    except ValueError as e:
+        logger.error(f"Error: {e}")
+        return "Could not process transcript: unexpected format.", {}
+    except Exception as e:
+        logger.error(f"Error during transcript conversion: {e}")
+        return "Could not process transcript.", {}
 
-                output_lines.append(f"[{segment_id}][{speaker}][{timestamp}] {text}")
 
-            logger.info(
-                f"Successfully converted transcript using audio_segments with {len(output_lines)} segments (with timestamps)"
-            )
-            return "\n".join(output_lines)
+def upload_s3_object(bucket, key, body, content_type):
+    """
+    Upload bytes to S3, switching to parallel multipart upload for large payloads.
+    """
+    s3_client.upload_fileobj(
+        BytesIO(body),
+        bucket,
+        key,
+        ExtraArgs={"ContentType": content_type},
+        Config=S3_TRANSFER_CONFIG,
+    )
 
-        # If audio_segments doesn't exist, build segments from speaker_labels and items
-        else:
-            logger.info("Using speaker_labels and items for transcript processing")
-            # Get speaker segments with timing information
-            speaker_segments = []
-            for segment in transcript_data["results"]["speaker_labels"]["segments"]:
-                speaker_segments.append(
-                    {
-                        "speaker_label": segment["speaker_label"],
-                        "start_time": float(segment["start_time"]),
-                        "end_time": float(segment["end_time"]),
-                        "items": [item["start_time"] for item in segment["items"]],
-                    }
-                )
 
-            # Sort segments by start_time
-            speaker_segments = sorted(speaker_segments, key=lambda x: x["start_time"])
-
-            # Get all items with their content
-            items_dict = {}
-            for item in transcript_data["results"]["items"]:
-                if "alternatives" in item and len(item["alternatives"]) > 0:
-                    item_id = int(item.get("id", 0))
-                    # For pronunciation items, include start_time
-                    if item["type"] == "pronunciation":
-                        items_dict[item_id] = {
-                            "content": item["alternatives"][0]["content"],
-                            "type": item["type"],
-                            "start_time": float(item.get("start_time", "0")),
-                            "end_time": float(item.get("end_time", "0")),
-                        }
-                    else:
-                        # For punctuation items, just include content
-                        items_dict[item_id] = {
-                            "content": item["alternatives"][0]["content"],
-                            "type": item["type"],
-                        }
-
-            # Build the sequential transcript segment by segment
-            output_lines = []
-
-            for idx, segment in enumerate(speaker_segments):
-                speaker = segment["speaker_label"]
-                segment_start = segment["start_time"]
-                segment_end = segment["end_time"]
-
-                # Find all items that belong to this segment
-                segment_items = []
-                for item_id, item in items_dict.items():
-                    if (
-                        item["type"] == "pronunciation"
-                        and segment_start <= item["start_time"] < segment_end
-                    ):
-                        segment_items.append((item_id, item))
-
-                # Sort items by start_time
-                segment_items.sort(key=lambda x: x[1]["start_time"])
-
-                # Build the text for this segment
-                segment_text = []
-                for item_id, item in segment_items:
-                    if segment_text and item["type"] != "punctuation":
-                        segment_text.append(" ")
-                    segment_text.append(item["content"])
-
-                    # Add any punctuation that follows this item
-                    if (
-                        item_id + 1 in items_dict
-                        and items_dict[item_id + 1]["type"] == "punctuation"
-                    ):
-                        segment_text.append(items_dict[item_id + 1]["content"])
-
-                # Add the segment to the transcript if it has content
-                if segment_items:
-                    segment_id = f"seg_{idx}"
-                    text = "".join(segment_text)
-
-                    # Format timestamp
-                    h = int(segment_start // 3600)
-                    m = int((segment_start % 3600) // 60)
-                    s = int(segment_start % 60)
-                    timestamp = f"{h:02d}:{m:02d}:{s:02d}"
-
-                    output_lines.append(
-                        f"[{segment_id}][{speaker}][{timestamp}] {text}"
-                    )
+def transcript_key_from_uri(uri, bucket_name):
+    """
+    Resolve the S3 key of a Transcribe output file from its TranscriptFileUri.
 
-            logger.info(
-                f"Successfully converted transcript using speaker_labels with {len(output_lines)} segments (with timestamps)"
-            )
-            return "\n".join(output_lines)
+    Transcribe reports path-style HTTPS URLs (https://s3.<region>.amazonaws.com/<bucket>/<key>),
+    so the bucket name is stripped from the front of the path.
+    """
+    parsed = urlparse(uri)
+    key = parsed.path.lstrip("/")
+    if parsed.scheme == "https" and key.startswith(f"{bucket_name}/"):
+        key = key[len(bucket_name) + 1 :]
+    return key
 
-    except Exception as e:
-        logger.error(f"Error during transcript conversion: {e}")
-        return "Could not process transcript."
 
+def fetch_transcript_json(bucket, key):
+    """
+    Stream-parse a Transcribe output JSON from S3.
 
-def fetch_s3_text_content(bucket, key):
-    """Fetch text content from S3."""
-    try:
-        logger.info(f"Fetching content from s3://{bucket}/{key}")
-        response = s3_client.get_object(Bucket=bucket, Key=key)
-        content = response["Body"].read().decode("utf-8")
-        logger.info(
-            f"Successfully fetched {len(content)} characters from s3://{bucket}/{key}"
-        )
-        return content
-    except Exception as e:
-        logger.error(f"Error fetching content from s3://{bucket}/{key}: {e}")
-        raise e
+    The response body is parsed incrementally, so the raw JSON is never held in
+    memory alongside the parsed objects. Only the "results" object is kept, minus
+    its "transcripts" entry (a full-text copy of the transcript that is not used).
+    """
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+
+    results = {}
+    for name, value in ijson.kvitems(response["Body"], "results"):
+        if name != "transcripts":
+            results[name] = value
+
+    return {"results": results}
 
 
 def analyze_transcript_with_bedrock(
@@ -193,12 +287,10 @@ def analyze_transcript_with_bedrock(
 
         logger.info(f"Formatted prompt length: {len(formatted_prompt)} characters")
 
-        # Get model configuration from environment variables with defaults
-        model_id = os.environ.get(
-            "TRANSCRIPT_MODEL_ID", "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
-        )
-        max_tokens = int(os.environ.get("TRANSCRIPT_MAX_TOKENS", "8000"))
-        temperature = float(os.environ.get("TRANSCRIPT_TEMPERATURE", "0.2"))
+        # Model configuration is loaded from environment variables at import
+        model_id = TRANSCRIPT_MODEL_ID
+        max_tokens = TRANSCRIPT_MAX_TOKENS
+        temperature = TRANSCRIPT_TEMPERATURE
 
         logger.info(
             f"Using model: {model_id}, max_tokens: {max_tokens}, temperature: {temperature}"
@@ -214,39 +306,53 @@ def analyze_transcript_with_bedrock(
 
         logger.info("Invoking Claude via Bedrock...")
 
-        # Log the complete message being sent to LLM
-        logger.info("=== MESSAGE BEING SENT TO LLM ===")
-        logger.info(f"Model ID: {model_id}")
-        logger.info(f"Request configuration: max_tokens={max_tokens}, temperature={temperature}")
-        logger.info(f"Full request body: {json.dumps(request_body, indent=2)}")
-        logger.info("=== COMPLETE PROMPT TEXT ===")
-        logger.info(formatted_prompt)
-        logger.info("=== END OF PROMPT TEXT ===")
+        # The request body carries the same prompt, so it is serialized only for
+        # the API call itself; the prompt text is logged once, on request
+        if LOG_FULL_PROMPT:
+            logger.info("=== COMPLETE PROMPT TEXT ===")
+            logger.info(formatted_prompt)
+            logger.info("=== END OF PROMPT TEXT ===")
 
         # Make the streaming API call
         response = bedrock_runtime.invoke_model_with_response_stream(
             modelId=model_id,
             contentType="application/json",
             accept="application/json",
-            body=json.dumps(request_body),
+            body=orjson.dumps(request_body),
         )
 
         # Process the streaming response
         analysis_chunks = []
+        stop_reason = None
         logger.info("Processing Claude's streaming response...")
 
         # Iterate through the streaming chunks
         for event in response.get("body"):
             if "chunk" in event:
-                chunk_data = json.loads(event["chunk"]["bytes"])
+                chunk_bytes = event["chunk"]["bytes"]
+                # Only text deltas and the final message delta matter; skip parsing the rest
+                if (
+                    b"content_block_delta" not in chunk_bytes
+                    and b"message_delta" not in chunk_bytes
+                ):
+                    continue
+                chunk_data = orjson.loads(chunk_bytes)
                 if chunk_data.get("type") == "content_block_delta" and chunk_data.get(
                     "delta", {}
                 ).get("text"):
                     text_chunk = chunk_data["delta"]["text"]
                     analysis_chunks.append(text_chunk)
+                elif chunk_data.get("type") == "message_delta":
+                    stop_reason = chunk_data.get("delta", {}).get("stop_reason")
 
         # Combine all chunks to return the complete analysis
         analysis = "".join(analysis_chunks)
+
+        if stop_reason == "max_tokens":
+            logger.warning(
+                f"Analysis truncated at max_tokens={max_tokens}; "
+                "consider raising TRANSCRIPT_MAX_TOKENS"
+            )
         
         # Log the complete response from LLM
         logger.info("=== COMPLETE RESPONSE FROM LLM ===")
@@ -270,41 +376,18 @@ def process_video_links_for_html(text):
     Input: "[seg_0]VIDEOLINK[https://video-url#t=00:01:23]ENDLINK"
     Output: "<a href='https://video-url#t=00:01:23' target='_blank'>[seg_0]</a>"
     """
-    # Pattern to match: [seg_X]VIDEOLINK[url]ENDLINK
-    pattern = r"([^\s]+)VIDEOLINK\[([^\]]+)\]ENDLINK"
-
     def replace_link(match):
         citation = match.group(1)
         url = match.group(2)
-        # HTML anchor tag with target="_blank" to open in new tab
-        return f'<a href="{url}" target="_blank" style="color: #3498db; text-decoration: none; font-weight: bold;">{citation}</a>'
-
-    return re.sub(pattern, replace_link, text)
-
-
-def generate_html_from_analysis(analysis_text, job_name, bucket_name):
-    """
-    Generate an HTML file from the Bedrock analysis text and save it to S3.
-
-    Args:
-        analysis_text (str): The analysis text from Bedrock with video link markers
-        job_name (str): The transcription job name for file naming
-        bucket_name (str): S3 bucket to save the HTML
+        # HTML anchor tag with target="_blank" to open in new tab; styling comes
+        # from the report stylesheet's "a" rule
+        return f'<a href="{url}" target="_blank">{citation}</a>'
 
-    Returns:
-        str: S3 key where the HTML was saved
-    """
-    try:
-        logger.info("Starting HTML generation from analysis text...")
+    return VIDEO_LINK_PATTERN.sub(replace_link, text)
 
-        # Process video links for HTML
-        html_content = process_video_links_for_html(analysis_text)
-
-        # Convert markdown to HTML
-        html_body = markdown.markdown(html_content)
 
-        # Create full HTML document with styling
-        html_document = f"""
+# Report page; literal CSS braces are doubled for str.format
+HTML_REPORT_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -312,72 +395,25 @@ def generate_html_from_analysis(analysis_text, job_name, bucket_name):
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Meeting Analysis Report</title>
     <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            color: #333;
-            background-color: #f9f9f9;
-        }}
-        .container {{
-            background-color: white;
-            padding: 40px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            text-align: center;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-            margin-bottom: 30px;
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; color: #333; background-color: #f9f9f9; }}
+        .container {{ background-color: white; padding: 40px; }}
+        h1 {{ color: #2c3e50; text-align: center; border-bottom: 3px solid #3498db; padding-bottom: 10px; margin-bottom: 30px; }}
+        h2 {{ color: #3498db; margin-top: 30px; margin-bottom: 15px; }}
+        h3 {{ color: #2c3e50; margin-top: 25px; margin-bottom: 10px; }}
+        p {{ margin-bottom: 15px; text-align: justify; }}
+        a {{ color: #3498db; text-decoration: none; font-weight: bold; }}
+        .metadata {{ background-color: #ecf0f1; padding: 15px; border-radius: 5px; margin-bottom: 30px; font-size: 14px; }}
+        .footer {{ text-align: center; margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd; color: #777; font-size: 12px; }}
+        ul, ol {{ margin-bottom: 15px; }}
+        li {{ margin-bottom: 5px; }}
+        @media screen {{
+            .container {{ border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+            a {{ transition: color 0.3s ease; }}
+            a:hover {{ color: #e74c3c; text-decoration: underline; }}
         }}
-        h2 {{
-            color: #3498db;
-            margin-top: 30px;
-            margin-bottom: 15px;
-        }}
-        h3 {{
-            color: #2c3e50;
-            margin-top: 25px;
-            margin-bottom: 10px;
-        }}
-        p {{
-            margin-bottom: 15px;
-            text-align: justify;
-        }}
-        a {{
-            color: #3498db;
-            text-decoration: none;
-            font-weight: bold;
-            transition: color 0.3s ease;
-        }}
-        a:hover {{
-            color: #e74c3c;
-            text-decoration: underline;
-        }}
-        .metadata {{
-            background-color: #ecf0f1;
-            padding: 15px;
-            border-radius: 5px;
-            margin-bottom: 30px;
-            font-size: 14px;
-        }}
-        .footer {{
-            text-align: center;
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            color: #777;
-            font-size: 12px;
-        }}
-        ul, ol {{
-            margin-bottom: 15px;
-        }}
-        li {{
-            margin-bottom: 5px;
+        /* The PDF renderer only ships DejaVu; naming it skips fontconfig fallback per text run */
+        @media print {{
+            body {{ font-family: 'DejaVu Sans', sans-serif; }}
         }}
     </style>
 </head>
@@ -386,14 +422,14 @@ def generate_html_from_analysis(analysis_text, job_name, bucket_name):
         <h1>Meeting Analysis Report</h1>
         
         <div class="metadata">
-            <strong>Generated:</strong> {datetime.datetime.now().strftime('%B %d, %Y at %H:%M UTC')}<br>
+            <strong>Generated:</strong> {generated}<br>
             <strong>Job Name:</strong> {job_name}
         </div>
         
-        {html_body}
+        {body}
         
         <div class="footer">
-            <p>© {datetime.datetime.now().year} Meeting Minutes</p>
+            <p>© {year} Meeting Minutes</p>
             <p><em>Click any segment reference (like [seg_0]) to jump to that moment in the video</em></p>
         </div>
     </div>
@@ -401,15 +437,45 @@ def generate_html_from_analysis(analysis_text, job_name, bucket_name):
 </html>
 """
 
+
+def generate_html_from_analysis(analysis_text, job_name, bucket_name):
+    """
+    Generate an HTML file from the Bedrock analysis text and save it to S3.
+
+    Args:
+        analysis_text (str): The analysis text from Bedrock with video link markers
+        job_name (str): The transcription job name for file naming
+        bucket_name (str): S3 bucket to save the HTML
+
+    Returns:
+        str: S3 key where the HTML was saved
+    """
+    try:
+        logger.info("Starting HTML generation from analysis text...")
+
+        # Process video links for HTML
+        html_content = process_video_links_for_html(analysis_text)
+
+        # Convert markdown to HTML
+        html_body = MARKDOWN_RENDERER.render(html_content)
+
+        # One UTC timestamp for both the header and the footer
+        now = time.gmtime()
+
+        # Fill the report template with the rendered analysis
+        html_document = HTML_REPORT_TEMPLATE.format(
+            generated=time.strftime("%B %d, %Y at %H:%M UTC", now),
+            job_name=job_name,
+            body=html_body,
+            year=now.tm_year,
+        )
+
         # Save HTML to S3
         html_key = f"analysis/{job_name}_analysis.html"
         logger.info(f"Saving HTML to s3://{bucket_name}/{html_key}")
 
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=html_key,
-            Body=html_document.encode("utf-8"),
-            ContentType="text/html",
+        upload_s3_object(
+            bucket_name, html_key, html_document.encode("utf-8"), "text/html"
         )
 
         logger.info(
@@ -451,7 +517,7 @@ def lambda_handler(event, context):
     Now also supports agenda integration when available.
     """
     logger.info("=== ProcessTranscript Lambda Started ===")
-    logger.info(f"Received event: {json.dumps(event, indent=2)}")
+    logger.info(f"Received event: {orjson.dumps(event, option=orjson.OPT_INDENT_2).decode()}")
 
     bucket_name = os.environ["S3_BUCKET"]
     logger.info(f"Using S3 bucket: {bucket_name}")
@@ -482,7 +548,7 @@ def lambda_handler(event, context):
 
         # Log additional debugging info
         if "event" in locals():
-            logger.error(f"Event data: {json.dumps(event, indent=2)}")
+            logger.error(f"Event data: {orjson.dumps(event, option=orjson.OPT_INDENT_2).decode()}")
         if "bucket_name" in locals():
             logger.error(f"Bucket name: {bucket_name}")
 
@@ -506,25 +572,14 @@ def handle_single_transcription(event, bucket_name, agenda_data=None):
     uri = transcription_job["Transcript"]["TranscriptFileUri"]
     logger.info(f"Transcript URI: {uri}")
 
-    parsed = urlparse(uri)
-    logger.info(
-        f"Parsed URI - scheme: {parsed.scheme}, netloc: {parsed.netloc}, path: {parsed.path}"
-    )
-
-    # Get the key from the URI
-    input_key = parsed.path.lstrip("/")
-    if parsed.scheme == "https" and input_key.startswith(f"{bucket_name}/"):
-        input_key = input_key[len(f"{bucket_name}/") :]
-        logger.info(f"Stripped bucket name from HTTPS URL path. New key: {input_key}")
-
+    input_key = transcript_key_from_uri(uri, bucket_name)
     input_bucket = bucket_name
 
     logger.info(f"Will fetch transcript from bucket: {input_bucket}, key: {input_key}")
 
     # Get the transcript JSON from S3
     logger.info("Fetching transcript JSON from S3...")
-    response = s3_client.get_object(Bucket=input_bucket, Key=input_key)
-    transcript_data = json.loads(response["Body"].read().decode("utf-8"))
+    transcript_data = fetch_transcript_json(input_bucket, input_key)
 
     logger.info("Successfully fetched and parsed transcript JSON")
     logger.info(
@@ -533,14 +588,21 @@ def handle_single_transcription(event, bucket_name, agenda_data=None):
 
     # Convert to human-readable format
     logger.info("Converting transcript to human-readable format...")
-    human_readable_transcript = convert_to_human_readable(transcript_data)
+    human_readable_transcript, segment_mapping = convert_to_human_readable(
+        transcript_data
+    )
 
     # Get video info from event
     video_info = event.get("originalVideoInfo", {})
 
     # Continue with analysis and PDF generation
     return process_transcript_analysis(
-        human_readable_transcript, job_name, bucket_name, video_info, agenda_data
+        human_readable_transcript,
+        segment_mapping,
+        job_name,
+        bucket_name,
+        video_info,
+        agenda_data,
     )
 
 
@@ -598,12 +660,9 @@ def handle_chunked_transcription(event, bucket_name, agenda_data=None):
                     f"Could not determine chunk timing from MediaConvert metadata: {e}"
                 )
 
-        uri = transcription_job["Transcript"]["TranscriptFileUri"]
-        parsed = urlparse(uri)
-        input_key = parsed.path.lstrip("/")
-
-        if parsed.scheme == "https" and input_key.startswith(f"{bucket_name}/"):
-            input_key = input_key[len(f"{bucket_name}/") :]
+        input_key = transcript_key_from_uri(
+            transcription_job["Transcript"]["TranscriptFileUri"], bucket_name
+        )
 
         chunks_data.append(
             {
@@ -616,31 +675,39 @@ def handle_chunked_transcription(event, bucket_name, agenda_data=None):
         )
 
     # Sort chunks by index to ensure proper order
-    chunks_data.sort(key=lambda x: x["chunk_index"])
+    chunks_data.sort(key=itemgetter("chunk_index"))
 
     logger.info("Fetching and merging all transcript chunks...")
 
-    # Fetch all transcript files
-    chunk_transcripts = []
+    # Fetch all transcript files concurrently; map() keeps results in chunk order
     for chunk in chunks_data:
         logger.info(
             f"Fetching transcript for chunk {chunk['chunk_index']}: {chunk['transcript_key']}"
         )
-        response = s3_client.get_object(Bucket=bucket_name, Key=chunk["transcript_key"])
-        transcript_data = json.loads(response["Body"].read().decode("utf-8"))
 
-        chunk_transcripts.append(
-            {
-                "data": transcript_data,
-                "chunk_index": chunk["chunk_index"],
-                "chunk_start_time": chunk["chunk_start_time"],
-                "job_name": chunk["job_name"],
-            }
+    with ThreadPoolExecutor(max_workers=min(8, len(chunks_data) or 1)) as fetch_pool:
+        transcripts = list(
+            fetch_pool.map(
+                lambda chunk: fetch_transcript_json(
+                    bucket_name, chunk["transcript_key"]
+                ),
+                chunks_data,
+            )
         )
 
+    chunk_transcripts = [
+        {
+            "data": transcript_data,
+            "chunk_index": chunk["chunk_index"],
+            "chunk_start_time": chunk["chunk_start_time"],
+            "job_name": chunk["job_name"],
+        }
+        for chunk, transcript_data in zip(chunks_data, transcripts)
+    ]
+
     # Merge transcripts with timestamp adjustment
     logger.info("Merging transcripts with timestamp adjustment...")
-    merged_transcript = merge_chunked_transcripts(chunk_transcripts)
+    merged_transcript, segment_mapping = merge_chunked_transcripts(chunk_transcripts)
 
     # Use the first job name as base for output files
     base_job_name = (
@@ -652,18 +719,26 @@ def handle_chunked_transcription(event, bucket_name, agenda_data=None):
 
     # Continue with analysis and PDF generation
     return process_transcript_analysis(
-        merged_transcript, base_job_name, bucket_name, video_info, agenda_data
+        merged_transcript,
+        segment_mapping,
+        base_job_name,
+        bucket_name,
+        video_info,
+        agenda_data,
     )
 
 
 def merge_chunked_transcripts(chunk_transcripts):
     """
     Merge multiple transcript chunks into a single human-readable transcript
-    with proper timestamp adjustment and speaker label consistency
+    with proper timestamp adjustment and speaker label consistency.
+
+    Returns a (merged_transcript, segment_mapping) tuple, as convert_to_human_readable does.
     """
     logger.info(f"Merging {len(chunk_transcripts)} transcript chunks")
 
     all_segments = []
+    segment_mapping = {}
     global_segment_counter = 0
     speaker_mapping = {}  # Map chunk-specific speaker labels to global labels
     global_speaker_counter = 0
@@ -677,55 +752,37 @@ def merge_chunked_transcripts(chunk_transcripts):
             f"Processing chunk {chunk_index} with start time offset {chunk_start_time}s"
         )
 
-        # Convert this chunk to human-readable format first
-        chunk_readable = convert_to_human_readable(transcript_data)
-
-        # Parse the human-readable format to extract segments
-        # Format: [seg_X][speaker_label][HH:MM:SS] spoken text
-        segment_pattern = r"\[([^\]]+)\]\[([^\]]+)\]\[([^\]]+)\] (.+)"
+        # Extract this chunk's segments with numeric start times so offsets can
+        # be applied directly, without formatting and re-parsing timestamps
+        try:
+            chunk_segments = extract_transcript_segments(transcript_data)
+        except Exception as e:
+            logger.error(f"Could not extract segments from chunk {chunk_index}: {e}")
+            continue
 
-        for line in chunk_readable.split("\n"):
-            line = line.strip()
-            if not line:
+        for _, speaker, start_time, text in chunk_segments:
+            text = text.rstrip()
+            if not text:
                 continue
 
-            match = re.match(segment_pattern, line)
-            if match:
-                seg_id, speaker, timestamp, text = match.groups()
-
-                # Parse timestamp
-                time_parts = timestamp.split(":")
-                if len(time_parts) == 3:
-                    hours, minutes, seconds = map(int, time_parts)
-                    segment_time_seconds = hours * 3600 + minutes * 60 + seconds
-
-                    # Adjust timestamp for chunk offset
-                    adjusted_time_seconds = segment_time_seconds + chunk_start_time
-
-                    # Convert back to timestamp format
-                    adj_hours = int(adjusted_time_seconds // 3600)
-                    adj_minutes = int((adjusted_time_seconds % 3600) // 60)
-                    adj_seconds = int(adjusted_time_seconds % 60)
-                    adjusted_timestamp = (
-                        f"{adj_hours:02d}:{adj_minutes:02d}:{adj_seconds:02d}"
-                    )
-
-                    # Handle speaker label consistency across chunks
-                    chunk_speaker_key = f"chunk_{chunk_index}_{speaker}"
-                    if chunk_speaker_key not in speaker_mapping:
-                        speaker_mapping[chunk_speaker_key] = (
-                            f"spk_{global_speaker_counter}"
-                        )
-                        global_speaker_counter += 1
+            # Adjust timestamp (whole seconds) for chunk offset
+            adjusted_timestamp = format_timestamp(int(start_time) + chunk_start_time)
 
-                    global_speaker = speaker_mapping[chunk_speaker_key]
+            # Handle speaker label consistency across chunks
+            chunk_speaker_key = (chunk_index, speaker)
+            global_speaker = speaker_mapping.get(chunk_speaker_key)
+            if global_speaker is None:
+                global_speaker = f"spk_{global_speaker_counter}"
+                speaker_mapping[chunk_speaker_key] = global_speaker
+                global_speaker_counter += 1
 
-                    # Create the adjusted segment
-                    adjusted_segment = f"[seg_{global_segment_counter}][{global_speaker}][{adjusted_timestamp}] {text}"
-                    all_segments.append(adjusted_segment)
-                    global_segment_counter += 1
-                else:
-                    logger.warning(f"Could not parse timestamp: {timestamp}")
+            # Create the adjusted segment
+            adjusted_segment = format_transcript_line(
+                global_segment_counter, global_speaker, adjusted_timestamp, text
+            )
+            all_segments.append(adjusted_segment)
+            segment_mapping[f"seg_{global_segment_counter}"] = adjusted_timestamp
+            global_segment_counter += 1
 
     merged_transcript = "\n".join(all_segments)
 
@@ -734,35 +791,7 @@ def merge_chunked_transcripts(chunk_transcripts):
     )
     logger.info(f"Total speakers identified: {global_speaker_counter}")
 
-    return merged_transcript
-
-
-def build_segment_timestamp_mapping(human_readable_transcript):
-    """
-    Parse human-readable transcript to create segment_id -> timestamp mapping
-
-    Input: "[seg_0][spk_0][00:01:23] Hello everyone..."
-    Output: {"seg_0": "00:01:23", "seg_1": "00:01:45", ...}
-    """
-    segment_mapping = {}
-
-    # Pattern to match: [seg_X][speaker][HH:MM:SS] text
-    segment_pattern = r"\[seg_(\d+)\]\[[^\]]+\]\[([^\]]+)\] (.+)"
-
-    for line in human_readable_transcript.split("\n"):
-        line = line.strip()
-        if not line:
-            continue
-
-        match = re.match(segment_pattern, line)
-        if match:
-            seg_number = match.group(1)
-            timestamp = match.group(2)
-            seg_id = f"seg_{seg_number}"
-            segment_mapping[seg_id] = timestamp
-
-    logger.info(f"Built segment mapping with {len(segment_mapping)} segments")
-    return segment_mapping
+    return merged_transcript, segment_mapping
 
 
 def parse_segment_references(text):
@@ -775,78 +804,33 @@ def parse_segment_references(text):
     - [seg_5-seg_6] → ["seg_5", "seg_6"]
     """
 
-    # Pattern 1: Single segment [seg_X]
-    single_pattern = r"\[seg_(\d+)\]"
-
-    # Pattern 2: Range format [seg_X-Y]
-    range_pattern1 = r"\[seg_(\d+)-(\d+)\]"
-
-    # Pattern 3: Range format [seg_X-seg_Y]
-    range_pattern2 = r"\[seg_(\d+)-seg_(\d+)\]"
-
     references = []
 
-    # Find single segments
-    for match in re.finditer(single_pattern, text):
-        seg_num = match.group(1)
+    # A single scan finds every citation form; finditer yields matches in text
+    # order and never overlapping, so no sorting or overlap filtering is needed
+    for match in SEGMENT_CITATION_PATTERN.finditer(text):
+        if match.group(2) is None:
+            segments = [f"seg_{match.group(1)}"]
+        else:
+            start_seg = int(match.group(1))
+            end_seg = int(match.group(2))
+            # Ensure valid range (start <= end)
+            if start_seg > end_seg:
+                logger.warning(f"Skipping invalid range: {match.group(0)} (start {start_seg} > end {end_seg})")
+                continue
+            segments = [f"seg_{i}" for i in range(start_seg, end_seg + 1)]
+
         references.append(
             {
                 "original": match.group(0),
-                "segments": [f"seg_{seg_num}"],
+                "segments": segments,
                 "start": match.start(),
                 "end": match.end(),
             }
         )
 
-    # Find range segments (format 1: seg_X-Y)
-    for match in re.finditer(range_pattern1, text):
-        start_seg = int(match.group(1))
-        end_seg = int(match.group(2))
-        # Ensure valid range (start <= end)
-        if start_seg <= end_seg:
-            segments = [f"seg_{i}" for i in range(start_seg, end_seg + 1)]
-            references.append(
-                {
-                    "original": match.group(0),
-                    "segments": segments,
-                    "start": match.start(),
-                    "end": match.end(),
-                }
-            )
-        else:
-            logger.warning(f"Skipping invalid range: {match.group(0)} (start {start_seg} > end {end_seg})")
-
-    # Find range segments (format 2: seg_X-seg_Y)
-    for match in re.finditer(range_pattern2, text):
-        start_seg = int(match.group(1))
-        end_seg = int(match.group(2))
-        # Ensure valid range (start <= end)
-        if start_seg <= end_seg:
-            segments = [f"seg_{i}" for i in range(start_seg, end_seg + 1)]
-            references.append(
-                {
-                    "original": match.group(0),
-                    "segments": segments,
-                    "start": match.start(),
-                    "end": match.end(),
-                }
-            )
-        else:
-            logger.warning(f"Skipping invalid range: {match.group(0)} (start {start_seg} > end {end_seg})")
-
-    # Remove overlapping matches (keep longer/more specific ones)
-    # Sort by start position and remove overlaps
-    references.sort(key=lambda x: (x["start"], -(x["end"] - x["start"])))
-    filtered_references = []
-    last_end = -1
-
-    for ref in references:
-        if ref["start"] >= last_end:
-            filtered_references.append(ref)
-            last_end = ref["end"]
-
-    logger.info(f"Found {len(filtered_references)} segment references in text")
-    return filtered_references
+    logger.info(f"Found {len(references)} segment references in text")
+    return references
 
 
 def generate_video_url_with_timestamp(bucket, key, timestamp_str):
@@ -888,12 +872,12 @@ def generate_video_url_with_timestamp(bucket, key, timestamp_str):
         if frontend_domain:
             # Use full URL to frontend application
             video_player_url = f"https://{frontend_domain}/video?id={meeting_id}&time={total_seconds}"
-            logger.info(f"Generated full frontend video URL: {video_player_url} for meeting {meeting_id} at {timestamp_str}")
+            logger.debug(f"Generated full frontend video URL: {video_player_url} for meeting {meeting_id} at {timestamp_str}")
         else:
             # Fallback to relative URL if frontend domain not configured
             logger.warning("Frontend domain not configured, using relative URL")
             video_player_url = f"/video?id={meeting_id}&time={total_seconds}"
-            logger.info(f"Generated relative video URL: {video_player_url} for meeting {meeting_id} at {timestamp_str}")
+            logger.debug(f"Generated relative video URL: {video_player_url} for meeting {meeting_id} at {timestamp_str}")
         
         return video_player_url
 
@@ -919,12 +903,17 @@ def replace_segment_citations_with_links(analysis_text, segment_mapping, bucket,
             logger.info("No segment references found in analysis text")
             return analysis_text
 
-        # Process references in reverse order to maintain string positions
-        modified_text = analysis_text
+        # Assemble the linked text in one forward pass over the sorted,
+        # non-overlapping references instead of re-slicing the whole string per link
+        parts = []
+        position = 0
         successful_replacements = 0
         failed_replacements = 0
 
-        for ref in reversed(references):
+        # The same segment is often cited many times; build each URL only once
+        video_urls = {}
+
+        for ref in references:
             try:
                 original_citation = ref["original"]
                 segments = ref["segments"]
@@ -940,21 +929,23 @@ def replace_segment_citations_with_links(analysis_text, segment_mapping, bucket,
 
                 if first_segment in segment_mapping:
                     timestamp = segment_mapping[first_segment]
-                    video_url = generate_video_url_with_timestamp(bucket, key, timestamp)
+                    if first_segment not in video_urls:
+                        video_urls[first_segment] = generate_video_url_with_timestamp(
+                            bucket, key, timestamp
+                        )
+                    video_url = video_urls[first_segment]
 
                     if video_url:
                         # Use a special marker format that won't be converted by html2text
                         # We'll process this during PDF generation to create proper ReportLab links
                         link_text = f"{original_citation}VIDEOLINK[{video_url}]ENDLINK"
 
-                        # Replace in text
-                        start_pos = ref["start"]
-                        end_pos = ref["end"]
-                        modified_text = (
-                            modified_text[:start_pos] + link_text + modified_text[end_pos:]
-                        )
+                        # Copy the text up to the citation, then the linked citation
+                        parts.append(analysis_text[position : ref["start"]])
+                        parts.append(link_text)
+                        position = ref["end"]
 
-                        logger.info(
+                        logger.debug(
                             f"Replaced {original_citation} with video link at {timestamp}"
                         )
                         successful_replacements += 1
@@ -974,8 +965,10 @@ def replace_segment_citations_with_links(analysis_text, segment_mapping, bucket,
                 failed_replacements += 1
                 continue  # Skip this reference but continue with others
 
+        parts.append(analysis_text[position:])
+
         logger.info(f"Segment link processing completed: {successful_replacements} successful, {failed_replacements} failed out of {len(references)} total references")
-        return modified_text
+        return "".join(parts)
 
     except Exception as e:
         logger.error(f"Critical error in replace_segment_citations_with_links: {e}")
@@ -984,40 +977,44 @@ def replace_segment_citations_with_links(analysis_text, segment_mapping, bucket,
 
 
 def process_transcript_analysis(
-    human_readable_transcript, job_name, bucket_name, video_info=None, agenda_data=None
+    human_readable_transcript,
+    segment_mapping,
+    job_name,
+    bucket_name,
+    video_info=None,
+    agenda_data=None,
 ):
     """
-    Common function to handle transcript analysis and PDF generation
+    Common function to handle transcript analysis and PDF generation.
+
+    segment_mapping maps segment IDs in the transcript to their timestamps and is
+    produced alongside the transcript text, so it is never re-parsed from it.
     """
     # Save human-readable version to S3
     human_readable_key = f"transcripts/{job_name}_human_readable.txt"
 
+    # Saved before the Bedrock call, so a failed write aborts the invocation
+    # before any model tokens are paid for
     logger.info(
         f"Saving human-readable transcript to s3://{bucket_name}/{human_readable_key}"
     )
-    s3_client.put_object(
-        Bucket=bucket_name,
-        Key=human_readable_key,
-        Body=human_readable_transcript.encode("utf-8"),
-        ContentType="text/plain",
+    upload_s3_object(
+        bucket_name,
+        human_readable_key,
+        human_readable_transcript.encode("utf-8"),
+        "text/plain",
     )
-
     logger.info("Human-readable transcript saved successfully")
 
-    # === BUILD SEGMENT MAPPING ===
-    logger.info("=== Building segment timestamp mapping ===")
-    segment_mapping = build_segment_timestamp_mapping(human_readable_transcript)
+    logger.info(f"Using segment mapping with {len(segment_mapping)} segments")
 
     # === BEDROCK ANALYSIS SECTION ===
     logger.info("=== Starting Bedrock Analysis Phase ===")
 
     analysis_error = None
     try:
-        # Get prompt template from environment variable
-        logger.info("Reading prompt template from environment variable...")
-        prompt_template = os.environ.get(
-            "TRANSCRIPT_PROMPT_TEMPLATE", "Default prompt template not configured"
-        )
+        # Prompt template is loaded from the environment once per container
+        prompt_template = TRANSCRIPT_PROMPT_TEMPLATE
 
         # Determine agenda source - use agenda data if available, otherwise fallback to environment variable
         if (
@@ -1028,36 +1025,47 @@ def process_transcript_analysis(
             logger.info("Using agenda data from uploaded PDF document")
             agenda_analysis = agenda_data["analysis_data"]
 
-            # Convert agenda analysis to text format for the prompt
-            agenda_text = f"""AGENDA ANALYSIS FROM UPLOADED DOCUMENT:
-
-Meeting Information:
-- Title: {agenda_analysis.get('meeting_metadata', {}).get('meeting_title', 'Not specified')}
-- Date: {agenda_analysis.get('meeting_metadata', {}).get('meeting_date', 'Not specified')}
-- Time: {agenda_analysis.get('meeting_metadata', {}).get('meeting_time', 'Not specified')}
-- Location: {agenda_analysis.get('meeting_metadata', {}).get('meeting_location', 'Not specified')}
-- Type: {agenda_analysis.get('meeting_metadata', {}).get('meeting_type', 'Not specified')}
-
-Participants:"""
+            # Convert agenda analysis to text format for the prompt, collecting
+            # lines and joining once rather than growing a string per item
+            metadata = agenda_analysis.get("meeting_metadata", {})
+            agenda_lines = [
+                "AGENDA ANALYSIS FROM UPLOADED DOCUMENT:",
+                "",
+                "Meeting Information:",
+                f"- Title: {metadata.get('meeting_title', 'Not specified')}",
+                f"- Date: {metadata.get('meeting_date', 'Not specified')}",
+                f"- Time: {metadata.get('meeting_time', 'Not specified')}",
+                f"- Location: {metadata.get('meeting_location', 'Not specified')}",
+                f"- Type: {metadata.get('meeting_type', 'Not specified')}",
+                "",
+                "Participants:",
+            ]
 
             for participant in agenda_analysis.get("participants", []):
-                agenda_text += f"\n- {participant.get('name', 'Unknown')} ({participant.get('role', 'No role specified')}) - {participant.get('attendance_status', 'Unknown status')}"
+                agenda_lines.append(
+                    f"- {participant.get('name', 'Unknown')} ({participant.get('role', 'No role specified')}) - {participant.get('attendance_status', 'Unknown status')}"
+                )
 
-            agenda_text += "\n\nAgenda Items:"
+            agenda_lines += ["", "Agenda Items:"]
             for item in agenda_analysis.get("agenda_items", []):
-                agenda_text += f"\n- {item.get('item_number', '')}: {item.get('title', 'Untitled')} - {item.get('description', 'No description')}"
+                line = f"- {item.get('item_number', '')}: {item.get('title', 'Untitled')} - {item.get('description', 'No description')}"
                 if item.get("presenter"):
-                    agenda_text += f" (Presenter: {item['presenter']})"
+                    line += f" (Presenter: {item['presenter']})"
+                agenda_lines.append(line)
 
             if agenda_analysis.get("background_context"):
-                agenda_text += (
-                    f"\n\nBackground Context:\n{agenda_analysis['background_context']}"
-                )
+                agenda_lines += [
+                    "",
+                    "Background Context:",
+                    agenda_analysis["background_context"],
+                ]
 
             if agenda_analysis.get("action_items_expected"):
-                agenda_text += "\n\nExpected Action Items:"
+                agenda_lines += ["", "Expected Action Items:"]
                 for action in agenda_analysis["action_items_expected"]:
-                    agenda_text += f"\n- {action}"
+                    agenda_lines.append(f"- {action}")
+
+            agenda_text = "\n".join(agenda_lines)
 
             logger.info(
                 f"Using enhanced agenda data with {len(agenda_analysis.get('agenda_items', []))} agenda items"
@@ -1066,9 +1074,7 @@ Participants:"""
             logger.info(
                 "No agenda data available - using fallback agenda from environment variable..."
             )
-            agenda_text = os.environ.get(
-                "FALLBACK_AGENDA_TEXT", "General meeting agenda not configured"
-            )
+            agenda_text = FALLBACK_AGENDA_TEXT
 
         # Perform Bedrock analysis with enhanced prompt for agenda integration
         logger.info("Performing Bedrock analysis with agenda context...")
@@ -1099,11 +1105,10 @@ Participants:"""
         analysis_key = f"analysis/{job_name}_analysis.txt"
         logger.info(f"Saving analysis result to s3://{bucket_name}/{analysis_key}")
 
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=analysis_key,
-            Body=analysis_result.encode("utf-8"),
-            ContentType="text/plain",
+        # Saved before the HTML report, so a failed upload never leaves a
+        # report in S3 for an analysis reported as failed
+        upload_s3_object(
+            bucket_name, analysis_key, analysis_result.encode("utf-8"), "text/plain"
         )
 
         logger.info("=== Bedrock Analysis Completed Successfully ===")
@@ -2,7 +2,8 @@ import json
 import boto3
 import logging
 import os
-from urllib.parse import urlparse
+from collections import defaultdict
+from botocore.exceptions import ClientError
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -10,6 +11,98 @@ logger.setLevel(logging.INFO)
 s3_client = boto3.client("s3")
 mediaconvert_client = boto3.client("mediaconvert")
 
+# Upper bound on ListObjectsV2 pages (1000 keys each) per batch check; a short
+# shared prefix must not turn a retry into a scan of the whole bucket
+VERIFY_LIST_MAX_PAGES = 2
+
+
+def parse_s3_uri(s3_uri):
+    """Split an s3://bucket/key URI into (bucket, key)."""
+    if not s3_uri.startswith("s3://"):
+        raise ValueError(f"Invalid S3 URI: {s3_uri}")
+
+    bucket, _, key = s3_uri[5:].partition("/")
+    return bucket, key.lstrip("/")
+
+
+def s3_object_exists(bucket, key):
+    """
+    Check a single object with HeadObject.
+
+    HeadObject has no response body, so a missing key surfaces as a generic
+    ClientError with a 404 code rather than the modeled NoSuchKey exception.
+    """
+    try:
+        s3_client.head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def verify_s3_uris_exist(s3_uris):
+    """
+    Check that every URI in a batch exists.
+
+    URIs are grouped by bucket and each group is verified with a single
+    paginated ListObjectsV2 over the keys' common prefix, instead of one
+    HeadObject per file. Groups with one key, or with no shared prefix,
+    fall back to HeadObject, as do keys not seen when the listing reaches
+    VERIFY_LIST_MAX_PAGES.
+
+    Args:
+        s3_uris (list): S3 URIs to verify
+
+    Returns:
+        dict: {"allExist": bool, "missing": [...], "checked": int}
+    """
+    logger.info(f"Verifying {len(s3_uris)} S3 objects")
+
+    keys_by_bucket = defaultdict(list)
+    for s3_uri in s3_uris:
+        bucket, key = parse_s3_uri(s3_uri)
+        keys_by_bucket[bucket].append((s3_uri, key))
+
+    missing = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for bucket, entries in keys_by_bucket.items():
+        prefix = os.path.commonprefix([key for _, key in entries])
+
+        if len(entries) == 1 or not prefix:
+            missing.extend(
+                s3_uri for s3_uri, key in entries if not s3_object_exists(bucket, key)
+            )
+            continue
+
+        existing_keys = set()
+        listing_complete = True
+        for page_number, page in enumerate(
+            paginator.paginate(Bucket=bucket, Prefix=prefix), 1
+        ):
+            existing_keys.update(obj["Key"] for obj in page.get("Contents", []))
+            if page.get("IsTruncated") and page_number >= VERIFY_LIST_MAX_PAGES:
+                logger.info(
+                    f"Listing s3://{bucket}/{prefix} exceeded {page_number} pages, "
+                    "checking remaining keys with HeadObject"
+                )
+                listing_complete = False
+                break
+
+        missing.extend(
+            s3_uri
+            for s3_uri, key in entries
+            if key not in existing_keys
+            and (listing_complete or not s3_object_exists(bucket, key))
+        )
+
+    if missing:
+        logger.warning(f"{len(missing)} of {len(s3_uris)} files do not exist: {missing}")
+    else:
+        logger.info(f"All {len(s3_uris)} files exist")
+
+    return {"allExist": not missing, "missing": missing, "checked": len(s3_uris)}
+
 
 def check_mediaconvert_jobs_status(job_ids):
     """
@@ -82,13 +175,13 @@ def check_agenda_exists(bucket, correlation_key):
     raw_text_key = f"processed/agenda/raw_text/{correlation_key}.txt"
 
     try:
-        # Check if analysis file exists
-        s3_client.head_object(Bucket=bucket, Key=analysis_key)
+        # A single GET both checks existence and fetches the analysis; a
+        # missing key raises NoSuchKey, so no separate HeadObject is needed
+        response = s3_client.get_object(Bucket=bucket, Key=analysis_key)
 
         # If it exists, try to load the analysis data
         try:
-            response = s3_client.get_object(Bucket=bucket, Key=analysis_key)
-            analysis_data = json.loads(response["Body"].read().decode("utf-8"))
+            analysis_data = json.loads(response["Body"].read())
 
             return {
                 "agenda_exists": True,
@@ -127,11 +220,13 @@ def lambda_handler(event, context):
 
     Input:
         - {"s3_uri": "s3://bucket/key"} for S3 file verification
+        - {"s3_uris": ["s3://bucket/key1", ...]} for batch S3 file verification
         - {"job_ids": ["job1", "job2", ...]} for MediaConvert job status checking
         - {"check_agenda": true, "video_s3_key": "uploads/meeting_recordings/file.mp4"} for agenda checking
 
     Output:
         - {"exists": true/false, "bucket": "bucket", "key": "key"} for S3
+        - {"allExist": true/false, "missing": [...], "checked": n} for batch S3
         - {"allComplete": true/false, "anyFailed": true/false, "jobStatuses": [...]} for MediaConvert
         - {"agenda_exists": true/false, "analysis_data": {...}, ...} for agenda checking
     """
@@ -163,35 +258,36 @@ def lambda_handler(event, context):
 
         return check_mediaconvert_jobs_status(job_ids)
 
-    # Otherwise, handle S3 file verification (original functionality)
+    # Check if this is a batch S3 file verification request
+    if "s3_uris" in event:
+        s3_uris = event["s3_uris"]
+        if not s3_uris or not isinstance(s3_uris, list):
+            raise ValueError("s3_uris must be a non-empty list")
+
+        return verify_s3_uris_exist(s3_uris)
+
+    # Otherwise, handle single S3 file verification (original functionality)
     s3_uri = event.get("s3_uri")
     if not s3_uri:
         raise ValueError(
-            "Either s3_uri, job_ids, or check_agenda is required in the input event"
+            "Either s3_uri, s3_uris, job_ids, or check_agenda is required in the input event"
         )
 
-    # Parse the S3 URI
-    parsed = urlparse(s3_uri)
-    if parsed.scheme != "s3":
-        raise ValueError(f"Invalid S3 URI scheme: {parsed.scheme}")
-
-    bucket = parsed.netloc
-    key = parsed.path.lstrip("/")
+    bucket, key = parse_s3_uri(s3_uri)
 
     logger.info(f"Checking if s3://{bucket}/{key} exists")
 
     try:
-        # Use head_object to check if the file exists
-        s3_client.head_object(Bucket=bucket, Key=key)
-        logger.info(f"File exists: s3://{bucket}/{key}")
-        exists = True
-    except s3_client.exceptions.NoSuchKey:
-        logger.warning(f"File does not exist: s3://{bucket}/{key}")
-        exists = False
+        exists = s3_object_exists(bucket, key)
     except Exception as e:
         logger.error(f"Error checking file existence: {e}")
         raise
 
+    if exists:
+        logger.info(f"File exists: s3://{bucket}/{key}")
+    else:
+        logger.warning(f"File does not exist: s3://{bucket}/{key}")
+
     result = {"exists": exists, "bucket": bucket, "key": key, "s3_uri": s3_uri}
 
     logger.info(f"Returning result: {json.dumps(result)}")
@@ -217,6 +217,8 @@ export class MeetingProcessorCdkStack extends cdk.Stack {
         TRANSCRIPT_TEMPERATURE: "0.2",
         TRANSCRIPT_PROMPT_TEMPLATE: transcriptPromptTemplate,
         FALLBACK_AGENDA_TEXT: fallbackAgendaText,
+        // Set to "true" to log full Bedrock prompts (they embed the transcript)
+        LOG_FULL_PROMPT: "false",
       },
     });
 
@@ -219,6 +219,8 @@ export class MeetingProcessorIntegration extends Construct {
           TRANSCRIPT_TEMPERATURE: "0.2",
           TRANSCRIPT_PROMPT_TEMPLATE: transcriptPromptTemplate,
           FALLBACK_AGENDA_TEXT: fallbackAgendaText,
+          // Set to "true" to log full Bedrock prompts (they embed the transcript)
+          LOG_FULL_PROMPT: "false",
         },
       }
     );